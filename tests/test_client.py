@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from yaylib.client import Client
+from yaylib.errors import HTTPBadRequestError
+from yaylib.responses import LoginUserResponse, Response
+from yaylib.state import Crypto, LocalUser, State
+
+base_path = os.path.dirname(os.path.dirname(__file__)) + "/.config/tests/"
+db_filename = base_path + "secret.db"
+
+
+class LocalServerTestCase(unittest.IsolatedAsyncioTestCase):
+    def create_app(self) -> web.Application:
+        raise NotImplementedError
+
+    async def asyncSetUp(self):
+        self.received = []
+
+        self.server = TestServer(self.create_app())
+        await self.server.start_server()
+        self.host = f"{self.server.host}:{self.server.port}"
+
+        # クライアントは常に https:// を付与するため、テストサーバー宛てのみ http:// に戻す
+        base_request = Client.base_request
+
+        async def local_base_request(client, method, url, **kwargs):
+            url = url.replace("https://" + self.host, "http://" + self.host, 1)
+            return await base_request(client, method, url, **kwargs)
+
+        self.base_request_patcher = patch.object(
+            Client, "base_request", local_base_request
+        )
+        self.base_request_patcher.start()
+
+        self.client = Client(
+            base_path=base_path, min_delay=0, max_delay=0, loglevel=logging.CRITICAL
+        )
+        # pylint: disable=protected-access
+        self.client._Client__header_manager.client_ip = "127.0.0.1"
+
+    async def asyncTearDown(self):
+        self.base_request_patcher.stop()
+        await self.client.close()
+        await self.server.close()
+        if os.path.isfile(db_filename):
+            os.remove(db_filename)
+
+
+class TestClientRequest(LocalServerTestCase):
+    def create_app(self) -> web.Application:
+        async def echo(request: web.Request) -> web.Response:
+            self.received.append(
+                {
+                    "content_type": request.headers.get("Content-Type"),
+                    "body": await request.json(),
+                }
+            )
+            return web.json_response({"result": "success"})
+
+        app = web.Application()
+        app.router.add_post("/echo", echo)
+        return app
+
+    async def test_request(self):
+        response = await self.client.request(
+            "POST",
+            self.host + "/echo",
+            json={"id": 1, "text": None},
+            return_type=Response,
+        )
+
+        self.assertEqual(response.result, "success")
+        self.assertEqual(self.received[0]["body"], {"id": 1})
+
+    async def test_request_with_session(self):
+        async with self.client:
+            response = await self.client.request(
+                "POST", self.host + "/echo", json={"id": 1}, return_type=Response
+            )
+
+        self.assertEqual(response.result, "success")
+
+    async def test_base_request_content_type(self):
+        response = await self.client.base_request(
+            "POST", f"http://{self.host}/echo", json={"id": 1}
+        )
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(self.received[0]["content_type"], "application/json")
+        self.assertEqual(self.received[0]["body"], {"id": 1})
+
+
+class TestBulkRestore(LocalServerTestCase):
+    def create_app(self) -> web.Application:
+        async def restore(request: web.Request) -> web.Response:
+            body = await request.json()
+            self.received.append(body)
+            if body["user_id"] == 0:
+                return web.json_response({}, status=400)
+            # 後に送られたリクエストほど先に返す
+            await asyncio.sleep(0.05 / body["user_id"])
+            return web.json_response(
+                {"user_id": body["user_id"], "access_token": "token"}
+            )
+
+        app = web.Application()
+        app.router.add_post("/v2/users/restore", restore)
+        return app
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.url_patcher = patch(
+            "yaylib.api.auth._URL_RESTORE", self.host + "/v2/users/restore"
+        )
+        self.url_patcher.start()
+
+    async def asyncTearDown(self):
+        self.url_patcher.stop()
+        await super().asyncTearDown()
+
+    def assert_restored(self, user_ids, results):
+        self.assertEqual(len(self.received), len(user_ids))
+        self.assertEqual(len({body["timestamp"] for body in self.received}), 1)
+        self.assertEqual(len({body["signed_info"] for body in self.received}), 1)
+
+        for user_id, result in zip(user_ids, results):
+            self.assertIsInstance(result, LoginUserResponse)
+            self.assertEqual(result.user_id, user_id)
+
+    async def test_bulk_restore(self):
+        user_ids = [1, 2, 3, 4]
+        results = await self.client.auth.bulk_restore(user_ids)
+        self.assert_restored(user_ids, results)
+
+    async def test_bulk_restore_sync(self):
+        user_ids = [1, 2, 3, 4]
+        results = await asyncio.to_thread(self.client.bulk_restore, user_ids)
+        self.assert_restored(user_ids, results)
+
+    async def test_bulk_restore_cancels_on_failure(self):
+        with self.assertRaises(HTTPBadRequestError):
+            await self.client.auth.bulk_restore([0, 1, 2])
+
+        pending = [
+            task
+            for task in asyncio.all_tasks()
+            if "__restore" in task.get_coro().__qualname__ and not task.done()
+        ]
+        self.assertEqual(pending, [])
+
+    async def test_restore_user(self):
+        result = await self.client.auth.restore_user(user_id=1)
+        self.assertIsInstance(result, LoginUserResponse)
+        self.assertEqual(result.user_id, 1)
+
+
+class TestLogin(LocalServerTestCase):
+    def create_app(self) -> web.Application:
+        async def login(request: web.Request) -> web.Response:
+            self.received.append(await request.json())
+            return web.json_response(
+                {
+                    "user_id": 1,
+                    "access_token": "login_access_token",
+                    "refresh_token": "login_refresh_token",
+                }
+            )
+
+        app = web.Application()
+        app.router.add_post("/v3/users/login_with_email", login)
+        return app
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.url_patcher = patch(
+            "yaylib.api.auth._URL_LOGIN", self.host + "/v3/users/login_with_email"
+        )
+        self.url_patcher.start()
+
+    async def asyncTearDown(self):
+        self.url_patcher.stop()
+        await super().asyncTearDown()
+
+    async def test_login_saves_snapshot(self):
+        entered = threading.Event()
+        release = threading.Event()
+
+        def pause_in_worker(func):
+            def wrapper(*args, **kwargs):
+                if threading.current_thread() is not threading.main_thread():
+                    entered.set()
+                    release.wait(5)
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        with patch.object(
+            Crypto, "encrypt", pause_in_worker(Crypto.encrypt)
+        ), patch.object(State, "create_user", pause_in_worker(State.create_user)):
+            task = asyncio.create_task(
+                self.client.auth.login("test@email.com", "password")
+            )
+            while not entered.is_set() and not task.done():
+                await asyncio.sleep(0.01)
+            self.assertTrue(entered.is_set())
+
+            # 保存中に別のリクエストがユーザーを更新する
+            self.client.state.set_user(
+                LocalUser(
+                    user_id=1,
+                    email="test@email.com",
+                    device_uuid=self.client.device_uuid,
+                    access_token="other_access_token",
+                    refresh_token="other_refresh_token",
+                )
+            )
+            release.set()
+            await task
+
+        user = self.client.state.decrypt(
+            self.client.state.get_user_by_email("test@email.com")
+        )
+        self.assertEqual(user.access_token, "login_access_token")
+        self.assertEqual(user.refresh_token, "login_refresh_token")
@@ -1,7 +1,12 @@
+import asyncio
 import os
 import unittest
+from dataclasses import replace
+from unittest.mock import patch
 
-from yaylib.state import LocalUser, Storage
+from cryptography.fernet import InvalidToken
+
+from yaylib.state import Crypto, LocalUser, State, Storage
 
 base_path = os.path.dirname(os.path.dirname(__file__)) + "/.config/tests/"
 db_filename = base_path + "test.db"
@@ -111,6 +116,17 @@ class TestStorage(unittest.TestCase):
         result = self.storage.delete_user(user.user_id)
         self.assertTrue(result)
 
+    def test_create_user_in_thread(self):
+        result = asyncio.run(asyncio.to_thread(self.storage.create_user, test_user))
+        self.assertTrue(result)
+
+        user = self.storage.get_user(test_user.user_id)
+        self.assertIsNotNone(user)
+        self.assertEqual(user.user_id, test_user.user_id)
+
+        result = self.storage.delete_user(user.user_id)
+        self.assertTrue(result)
+
     def test_delete_user(self):
         result = self.storage.create_user(test_user)
         self.assertTrue(result)
@@ -120,3 +136,56 @@ class TestStorage(unittest.TestCase):
 
         user = self.storage.get_user(test_user.user_id)
         self.assertIsNone(user)
+
+
+class TestState(unittest.TestCase):
+    def setUp(self):
+        TestStorage.clean()
+        if not os.path.exists(base_path):
+            os.makedirs(base_path)
+        self.state = State(storage_path=db_filename, password="password")
+
+    def tearDown(self):
+        TestStorage.clean()
+
+    def test_decrypt_cached_user(self):
+        self.state.set_user(test_user)
+        self.assertTrue(self.state.save())
+
+        with patch.object(
+            Crypto, "decrypt", autospec=True, side_effect=Crypto.decrypt
+        ) as mock_decrypt:
+            user = self.state.decrypt(self.state.get_user_by_email(test_user.email))
+            self.assertEqual(user, test_user)
+            self.assertEqual(mock_decrypt.call_count, 3)
+
+            user = self.state.decrypt(self.state.get_user_by_email(test_user.email))
+            self.assertEqual(user, test_user)
+            self.assertEqual(mock_decrypt.call_count, 3)
+
+    def test_decrypt_after_resave(self):
+        self.state.set_user(test_user)
+        self.assertTrue(self.state.save())
+
+        self.state.decrypt(self.state.get_user_by_email(test_user.email))
+
+        self.state.set_user(replace(test_user, access_token="new_access_token"))
+        self.assertTrue(self.state.update())
+
+        with patch.object(
+            Crypto, "decrypt", autospec=True, side_effect=Crypto.decrypt
+        ) as mock_decrypt:
+            user = self.state.decrypt(self.state.get_user_by_email(test_user.email))
+            self.assertEqual(user.access_token, "new_access_token")
+            self.assertEqual(mock_decrypt.call_count, 3)
+
+    def test_decrypt_after_key_change(self):
+        self.state.set_user(test_user)
+        self.assertTrue(self.state.save())
+
+        user = self.state.get_user_by_email(test_user.email)
+        self.state.decrypt(replace(user))
+
+        self.state.set_encryption_key("another_password")
+        with self.assertRaises(InvalidToken):
+            self.state.decrypt(user)
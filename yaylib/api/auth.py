@@ -22,16 +22,22 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from datetime import datetime
-from typing import Optional
-
-from cryptography import fernet
+import asyncio
+import time
+from typing import List, Optional
 
 from .. import config
 from ..responses import LoginUpdateResponse, LoginUserResponse, Response, TokenResponse
 from ..state import LocalUser
 from ..utils import md5
 
+_URL_CHANGE_EMAIL = config.API_HOST + "/v1/users/change_email"
+_URL_TOKEN = config.API_HOST + "/api/v1/oauth/token"
+_URL_LOGIN = config.API_HOST + "/v3/users/login_with_email"
+_URL_RESEND_CONFIRM_EMAIL = config.API_HOST + "/v2/users/resend_confirm_email"
+_URL_RESTORE = config.API_HOST + "/v2/users/restore"
+_URL_LOGIN_UPDATE = config.API_HOST + "/v3/users/login_update"
+
 
 class AuthApi:
     """認証 API
@@ -40,12 +46,61 @@ class AuthApi:
         client (Client):
     """
 
+    __slots__ = ("__client",)
+
     def __init__(self, client) -> None:
         # pylint: disable=import-outside-toplevel
         from ..client import Client
 
         self.__client: Client = client
 
+    async def __restore(
+        self, timestamp: int, signed_info: str, **params
+    ) -> LoginUserResponse:
+        """署名済みの復元リクエストを送信する"""
+        params.update(
+            {
+                "api_key": config.API_KEY,
+                "uuid": self.__client.device_uuid,
+                "timestamp": timestamp,
+                "signed_info": signed_info,
+            }
+        )
+        return await self.__client.request(
+            "POST",
+            _URL_RESTORE,
+            json=params,
+            return_type=LoginUserResponse,
+        )
+
+    async def bulk_restore(self, user_ids: List[int]) -> List[LoginUserResponse]:
+        """複数のユーザーを並行して復元する
+
+        Note:
+            いずれかの復元に失敗した場合は、残りのリクエストをキャンセルして例外を送出する
+
+        Args:
+            user_ids (List[int]):
+
+        Returns:
+            List[LoginUserResponse]: `user_ids` と同じ順序
+        """
+        timestamp = int(time.time())
+        signed_info = md5(self.__client.device_uuid, timestamp, False)
+        tasks = [
+            asyncio.ensure_future(
+                self.__restore(timestamp, signed_info, user_id=user_id)
+            )
+            for user_id in user_ids
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
     async def change_email(self, **params) -> LoginUpdateResponse:
         """メールアドレスを変更する
 
@@ -59,7 +114,7 @@ class AuthApi:
         """
         return await self.__client.request(
             "PUT",
-            config.API_HOST + "/v1/users/change_email",
+            _URL_CHANGE_EMAIL,
             json=params,
             return_type=LoginUpdateResponse,
         )
@@ -76,7 +131,7 @@ class AuthApi:
         """
         return await self.__client.request(
             "PUT",
-            config.API_HOST + "/v1/users/change_email",
+            _URL_CHANGE_EMAIL,
             json=params,
             return_type=LoginUpdateResponse,
         )
@@ -95,7 +150,7 @@ class AuthApi:
         """
         return await self.__client.request(
             "POST",
-            config.API_HOST + "/api/v1/oauth/token",
+            _URL_TOKEN,
             json=params,
             return_type=TokenResponse,
         )
@@ -113,63 +168,65 @@ class AuthApi:
         Returns:
             LoginUserResponse:
         """
-        if not self.__client.state.has_encryption_key():
-            self.__client.state.set_encryption_key(password)
+        client = self.__client
+        state = client.state
+        logger = client.logger
 
-        user = self.__client.state.get_user_by_email(email)
+        if not state.has_encryption_key():
+            state.set_encryption_key(password)
+
+        user = state.get_user_by_email(email)
         if user is not None:
+            # pylint: disable=import-outside-toplevel
+            from cryptography import fernet
+
             try:
-                self.__client.state.set_user(self.__client.state.decrypt(user))
+                state.set_user(state.decrypt(user))
             except fernet.InvalidToken as exc:
-                self.__client.state.destory(user.user_id)
-                self.__client.logger.error(
+                state.destory(user.user_id)
+                logger.error(
                     # pylint: disable=line-too-long
                     "Failed to decrypt the credentials stored locally. This might be due to a recent password change. Please try logging in again."
                 )
                 raise exc
 
-            self.__client.logger.info(
-                f"User found in local storage - UID: {user.user_id}"
-            )
+            logger.info(f"User found in local storage - UID: {user.user_id}")
 
-            return LoginUserResponse(
-                {
-                    "access_token": self.__client.access_token,
-                    "refresh_token": self.__client.refresh_token,
-                    "user_id": self.__client.user_id,
-                }
+            return LoginUserResponse.from_fields(
+                client.access_token,
+                client.refresh_token,
+                client.user_id,
             )
 
         payload = {
             "api_key": config.API_KEY,
             "email": email,
             "password": password,
-            "uuid": self.__client.device_uuid,
+            "uuid": client.device_uuid,
         }
         if two_fa_code is not None:
             payload["two_fa_code"] = two_fa_code
 
-        response: LoginUserResponse = await self.__client.request(
+        response: LoginUserResponse = await client.request(
             "POST",
-            config.API_HOST + "/v3/users/login_with_email",
+            _URL_LOGIN,
             json=payload,
             return_type=LoginUserResponse,
         )
 
-        self.__client.state.set_user(
+        state.set_user(
             LocalUser(
                 user_id=response.user_id,
                 email=email,
-                device_uuid=self.__client.device_uuid,
+                device_uuid=client.device_uuid,
                 access_token=response.access_token,
                 refresh_token=response.refresh_token,
             )
         )
-        self.__client.state.save()
+        # 暗号化はイベントループ上で行い、書き込みのみを別スレッドに任せる
+        await asyncio.to_thread(state.create_user, state.encrypt_user())
 
-        self.__client.logger.info(
-            f"Authentication successful! - UID: {response.user_id}"
-        )
+        logger.info(f"Authentication successful! - UID: {response.user_id}")
 
         return response
 
@@ -181,7 +238,7 @@ class AuthApi:
         """
         return await self.__client.request(
             "POST",
-            config.API_HOST + "/v2/users/resend_confirm_email",
+            _URL_RESEND_CONFIRM_EMAIL,
             return_type=Response,
         )
 
@@ -194,23 +251,9 @@ class AuthApi:
         Returns:
             LoginUserResponse:
         """
-        params.update(
-            {
-                "api_key": config.API_KEY,
-                "uuid": self.__client.device_uuid,
-                "timestamp": int(datetime.now().timestamp()),
-                "signed_info": md5(
-                    self.__client.device_uuid,
-                    int(datetime.now().timestamp()),
-                    False,
-                ),
-            }
-        )
-        return await self.__client.request(
-            "POST",
-            config.API_HOST + "/v2/users/restore",
-            json=params,
-        )
+        timestamp = int(time.time())
+        signed_info = md5(self.__client.device_uuid, timestamp, False)
+        return await self.__restore(timestamp, signed_info, **params)
 
     async def save_account_with_email(self, **params) -> LoginUpdateResponse:
         """メールアドレスでアカウントを保存する
@@ -227,7 +270,7 @@ class AuthApi:
         params.update({"api_key": config.API_KEY})
         return await self.__client.request(
             "POST",
-            config.API_HOST + "/v3/users/login_update",
+            _URL_LOGIN_UPDATE,
             json=params,
             return_type=LoginUpdateResponse,
         )
@@ -26,7 +26,7 @@ import asyncio
 import logging
 import os
 import random
-from datetime import datetime
+import time
 from typing import Dict, List, Optional
 
 import aiohttp
@@ -122,7 +122,7 @@ from .responses import (
     WebSocketTokenResponse,
 )
 from .state import LocalUser, State
-from .utils import CustomFormatter, filter_dict, generate_jwt
+from .utils import CustomFormatter, filter_dict, generate_jwt, json_dumps, json_loads
 from .ws import Intents, WebSocketInteractor
 
 __all__ = ["Client"]
@@ -248,7 +248,7 @@ class HeaderManager:
         headers = {
             "Host": self.__host,
             "User-Agent": self.__user_agent,
-            "X-Timestamp": str(int(datetime.now().timestamp())),
+            "X-Timestamp": str(int(time.time())),
             "X-App-Version": self.__app_version,
             "X-Device-Info": self.__device_info,
             "X-Device-UUID": self.__state.device_uuid,
@@ -298,7 +298,7 @@ class Client(WebSocketInteractor):
 
         self.__proxy_url = proxy_url
         self.__timeout = timeout
-        self.__session = None
+        self.__session: Optional[aiohttp.ClientSession] = None
         self.__min_delay = min_delay
         self.__max_delay = max_delay
         self.__last_request_ts = 0
@@ -334,6 +334,33 @@ class Client(WebSocketInteractor):
 
         self.logger.info("yaylib version: %s started.", __version__)
 
+    async def __aenter__(self) -> "Client":
+        if self.__session is None or self.__session.closed:
+            self.__session = self.__create_session()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """HTTP セッションを閉じる"""
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    @staticmethod
+    def __create_session() -> aiohttp.ClientSession:
+        """コネクションプールを持つ HTTP セッションを生成する"""
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=32,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+                keepalive_timeout=75,
+            )
+        )
+
     @property
     def state(self) -> State:
         """状態管理オブジェクト"""
@@ -383,14 +410,24 @@ class Client(WebSocketInteractor):
             kwargs.get("json"),
         )
 
-        session = self.__session or aiohttp.ClientSession()
-        async with session.request(
-            method, url, proxy=self.__proxy_url, timeout=self.__timeout, **kwargs
-        ) as response:
-            await response.read()
-
-        if self.__session is None:
-            await session.close()
+        payload = kwargs.pop("json", None)
+        if payload is not None:
+            kwargs["data"] = json_dumps(payload)
+            headers = dict(kwargs.get("headers") or {})
+            if not any(key.lower() == "content-type" for key in headers):
+                headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+
+        persistent = self.__session is not None and not self.__session.closed
+        session = self.__session if persistent else self.__create_session()
+        try:
+            async with session.request(
+                method, url, proxy=self.__proxy_url, timeout=self.__timeout, **kwargs
+            ) as response:
+                await response.read()
+        finally:
+            if not persistent:
+                await session.close()
 
         self.logger.debug(
             "Received API response: [%s] %s\n\nHTTP Status: %s\n\nHeaders: %s\n\nResponse: %s\n",
@@ -420,7 +457,9 @@ class Client(WebSocketInteractor):
         response = await self.base_request(
             method, url, params=params, json=json, headers=headers
         )
-        response_json: Optional[dict] = await response.json(content_type=None)
+        response_json: Optional[dict] = await response.json(
+            loads=json_loads, content_type=None
+        )
         return self.__construct_response(response_json, return_type)
 
     async def __refresh_client_tokens(self) -> None:
@@ -437,13 +476,22 @@ class Client(WebSocketInteractor):
                 refresh_token=response.refresh_token,
             )
         )
-        self.__state.update()
+        # 暗号化はイベントループ上で行い、書き込みのみを別スレッドに任せる
+        user = self.__state.encrypt_user()
+        await asyncio.to_thread(
+            self.__state.update_user,
+            user.user_id,
+            email=user.email,
+            device_uuid=user.device_uuid,
+            access_token=user.access_token,
+            refresh_token=user.refresh_token,
+        )
 
     async def __insert_delay(self) -> None:
         """リクエスト間の時間が1秒未満のときに遅延を挿入する"""
-        if int(datetime.now().timestamp()) - self.__last_request_ts < 1:
+        if int(time.time()) - self.__last_request_ts < 1:
             await asyncio.sleep(random.uniform(self.__min_delay, self.__max_delay))
-        self.__last_request_ts = int(datetime.now().timestamp())
+        self.__last_request_ts = int(time.time())
 
     async def request(
         self,
@@ -1570,6 +1618,22 @@ class Client(WebSocketInteractor):
 
     # ---------- auth api ----------
 
+    def bulk_restore(self, user_ids: List[int]) -> List[LoginUserResponse]:
+        """複数のユーザーを並行して復元する
+
+        Args:
+            user_ids (List[int]):
+
+        Returns:
+            List[LoginUserResponse]:
+        """
+
+        async def bulk_restore() -> List[LoginUserResponse]:
+            async with self:
+                return await self.auth.bulk_restore(user_ids)
+
+        return asyncio.run(bulk_restore())
+
     def change_email(self, **params) -> LoginUpdateResponse:
         """メールアドレスを変更する
 
@@ -27,6 +27,7 @@ from json.decoder import JSONDecodeError
 import aiohttp
 
 from .responses import ErrorResponse
+from .utils import json_loads
 
 
 class YaylibError(Exception):
@@ -586,7 +587,7 @@ async def raise_for_code(response: aiohttp.ClientResponse) -> None:
         ClientError:
     """
     try:
-        response_json = await response.json(content_type=None)
+        response_json = await response.json(loads=json_loads, content_type=None)
         if response_json is None:
             return None
     except JSONDecodeError:
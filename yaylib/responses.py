@@ -741,6 +741,19 @@ class LoginUserResponse(Response):
         self.refresh_token = data.get("refresh_token")
         self.expires_in = data.get("expires_in")
 
+    @classmethod
+    def from_fields(
+        cls, access_token: str, refresh_token: str, user_id: int
+    ) -> "LoginUserResponse":
+        """認証情報からレスポンスを生成する"""
+        return cls(
+            {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "user_id": user_id,
+            }
+        )
+
     def __repr__(self):
         return f"LoginUserResponse(data={self.data})"
 
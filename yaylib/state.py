@@ -27,12 +27,13 @@ import hashlib
 import sqlite3
 from dataclasses import dataclass
 from queue import Queue
-from typing import Optional
-
-from cryptography.fernet import Fernet
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 from . import utils
 
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
 
 @dataclass(slots=True)
 class LocalUser:
@@ -49,12 +50,12 @@ class Crypto:
     """暗号化を行うクラス"""
 
     def __init__(self, password: Optional[str] = None) -> None:
-        self.__encryption_key: Optional[Fernet] = None
+        self.__encryption_key: Optional["Fernet"] = None
         if password is not None:
             self.__encryption_key = self.generate_key(password)
 
     @staticmethod
-    def generate_key(password: str) -> Fernet:
+    def generate_key(password: str) -> "Fernet":
         """鍵を生成する
 
         Args:
@@ -63,6 +64,9 @@ class Crypto:
         Returns:
             Fernet: 鍵
         """
+        # pylint: disable=import-outside-toplevel
+        from cryptography.fernet import Fernet
+
         hashed = hashlib.sha256(password.encode()).digest()
         key = base64.urlsafe_b64encode(hashed[:32])
         return Fernet(key)
@@ -76,7 +80,7 @@ class Crypto:
         """
         return hashlib.sha256(text.encode()).hexdigest()
 
-    def set_encryption_key(self, key: Fernet) -> None:
+    def set_encryption_key(self, key: "Fernet") -> None:
         """鍵を設定する
 
         Args:
@@ -134,7 +138,8 @@ class SQLiteConnectionPool:
     def __init__(self, db_path, pool_size=5):
         self.__pool = Queue(maxsize=pool_size)
         for _ in range(pool_size):
-            self.__pool.put(sqlite3.connect(db_path))
+            # コネクションはプールを介して一度に一つのスレッドにのみ貸し出される
+            self.__pool.put(sqlite3.connect(db_path, check_same_thread=False))
 
     def get_connection(self) -> sqlite3.Connection:
         """コネクションを取得する"""
@@ -297,6 +302,10 @@ class State(Storage):
         self.refresh_token = ""
 
         self.__crypto = Crypto(password)
+        self.__key_generation = 0
+        self.__decrypt_cache: Dict[
+            int, Tuple[int, Tuple[str, str, str], Tuple[str, str, str]]
+        ] = {}
 
     def set_user(self, user: LocalUser) -> None:
         """ユーザーを設定する
@@ -333,6 +342,7 @@ class State(Storage):
         """
         key = self.__crypto.generate_key(password)
         self.__crypto.set_encryption_key(key)
+        self.__key_generation += 1
 
     def has_encryption_key(self) -> bool:
         """鍵が設定されているか確認する
@@ -345,17 +355,54 @@ class State(Storage):
     def decrypt(self, user: LocalUser) -> LocalUser:
         """設定された鍵からユーザー情報を復号化する
 
+        Note:
+            同じ鍵・同じ暗号文に対する復号結果はキャッシュされる
+
         Args:
             user (LocalUser): 暗号化されたユーザー
 
         Returns:
             LocalUser: 復号化されたユーザー
         """
+        encrypted = (user.device_uuid, user.access_token, user.refresh_token)
+
+        cached = self.__decrypt_cache.get(user.user_id)
+        if (
+            cached is not None
+            and cached[0] == self.__key_generation
+            and cached[1] == encrypted
+        ):
+            user.device_uuid, user.access_token, user.refresh_token = cached[2]
+            return user
+
         user.device_uuid = self.__crypto.decrypt(user.device_uuid)
         user.access_token = self.__crypto.decrypt(user.access_token)
         user.refresh_token = self.__crypto.decrypt(user.refresh_token)
+
+        self.__decrypt_cache[user.user_id] = (
+            self.__key_generation,
+            encrypted,
+            (user.device_uuid, user.access_token, user.refresh_token),
+        )
         return user
 
+    def encrypt_user(self) -> LocalUser:
+        """設定されたユーザーを保存用に暗号化する
+
+        Note:
+            メールアドレスはハッシュ化、その他の認証情報は暗号化される
+
+        Returns:
+            LocalUser: 暗号化されたユーザー
+        """
+        return LocalUser(
+            self.user_id,
+            email=self.__crypto.hash(self.email),
+            device_uuid=self.__crypto.encrypt(self.device_uuid),
+            access_token=self.__crypto.encrypt(self.access_token),
+            refresh_token=self.__crypto.encrypt(self.refresh_token),
+        )
+
     def save(self) -> bool:
         """設定されたユーザーをデータベースに保存する
 
@@ -365,15 +412,7 @@ class State(Storage):
         Returns:
             bool:
         """
-        return self.create_user(
-            LocalUser(
-                self.user_id,
-                email=self.__crypto.hash(self.email),
-                device_uuid=self.__crypto.encrypt(self.device_uuid),
-                access_token=self.__crypto.encrypt(self.access_token),
-                refresh_token=self.__crypto.encrypt(self.refresh_token),
-            )
-        )
+        return self.create_user(self.encrypt_user())
 
     def update(self) -> bool:
         """設定されたユーザー情報を元にデータベースをアップデートする
@@ -384,12 +423,13 @@ class State(Storage):
         Returns:
             bool:
         """
+        user = self.encrypt_user()
         return self.update_user(
-            self.user_id,
-            email=self.__crypto.hash(self.email),
-            device_uuid=self.__crypto.encrypt(self.device_uuid),
-            access_token=self.__crypto.encrypt(self.access_token),
-            refresh_token=self.__crypto.encrypt(self.refresh_token),
+            user.user_id,
+            email=user.email,
+            device_uuid=user.device_uuid,
+            access_token=user.access_token,
+            refresh_token=user.refresh_token,
         )
 
     def destory(self, user_id: int) -> bool:
@@ -398,4 +438,5 @@ class State(Storage):
         Returns:
             bool:
         """
+        self.__decrypt_cache.pop(user_id, None)
         return self.delete_user(user_id)
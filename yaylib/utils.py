@@ -25,14 +25,21 @@ SOFTWARE.
 import base64
 import hashlib
 import hmac
+import json
 import logging
 import re
 import uuid
 from base64 import urlsafe_b64encode
 from datetime import datetime
+from functools import lru_cache
 from json import dumps
 from typing import Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from . import config
 from .constants import Color
 from .models import Attachment
@@ -123,11 +130,32 @@ def get_post_type(**kwargs) -> str:
 def filter_dict(params: Optional[dict] = None) -> Optional[dict]:
     if params is None:
         return None
-    new_params = {}
-    for k in params:
-        if params[k] is not None:
-            new_params[k] = params[k]
-    return new_params
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def json_dumps(obj: Any) -> bytes:
+    """オブジェクトを JSON のバイト列に変換する
+
+    Note:
+        `orjson` がインストールされている場合はそちらを使用する
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def json_loads(data: bytes | str) -> Any:
+    """JSON をデコードする
+
+    Note:
+        `orjson` がインストールされている場合はそちらを使用する。
+        空のボディの場合は None を返す
+    """
+    if not data or not data.strip():
+        return None
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def generate_uuid(uuid_type=True):
@@ -192,11 +220,16 @@ def get_hashed_filename(att: Attachment, file_type: str, key: int, uuid_str: str
     return hashed_filename
 
 
+@lru_cache(maxsize=16)
+def _md5_seed(device_uuid: str):
+    return hashlib.md5((config.API_KEY + device_uuid).encode())
+
+
 def md5(device_uuid: str, timestamp: int, require_shared_key: bool) -> str:
     shared_key: str = config.SHARED_KEY if require_shared_key else ""
-    return hashlib.md5(
-        (config.API_KEY + device_uuid + str(timestamp) + shared_key).encode()
-    ).hexdigest()
+    hashed = _md5_seed(device_uuid).copy()
+    hashed.update((str(timestamp) + shared_key).encode())
+    return hashed.hexdigest()
 
 
 def sha256() -> str: